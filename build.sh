@@ -234,7 +234,8 @@ ENV_BLOCK='      SKILLSCALE_BROKER_URL: "redpanda:29092"
       SKILLSCALE_ROOT: "/app"
       OPENAI_API_KEY: "'"${OPENAI_API_KEY}"'"
       OPENAI_API_BASE: "'"${OPENAI_API_BASE}"'"
-      LLM_PROVIDER: "'"${LLM_PROVIDER}"'"'
+      LLM_PROVIDER: "'"${LLM_PROVIDER}"'"
+      SKILLSCALE_WORKERS: "'"${SKILLSCALE_WORKERS}"'"'
 
 # Add optional provider keys if set
 [[ -n "${AZURE_API_KEY:-}" ]]     && ENV_BLOCK+=$'\n''      AZURE_API_KEY: "'"${AZURE_API_KEY}"'"'
@@ -243,6 +244,8 @@ ENV_BLOCK='      SKILLSCALE_BROKER_URL: "redpanda:29092"
 [[ -n "${AZURE_API_VERSION:-}" ]] && ENV_BLOCK+=$'\n''      AZURE_API_VERSION: "'"${AZURE_API_VERSION}"'"'
 [[ -n "${ZHIPU_API_KEY:-}" ]]     && ENV_BLOCK+=$'\n''      ZHIPU_API_KEY: "'"${ZHIPU_API_KEY}"'"'
 [[ -n "${ZHIPU_MODEL:-}" ]]       && ENV_BLOCK+=$'\n''      ZHIPU_MODEL: "'"${ZHIPU_MODEL}"'"'
+[[ -n "${SKILLSCALE_PRODUCER_LINGER_MS:-}" ]] && ENV_BLOCK+=$'\n''      SKILLSCALE_PRODUCER_LINGER_MS: "'"${SKILLSCALE_PRODUCER_LINGER_MS}"'"'
+[[ -n "${SKILLSCALE_DIRECT_EXEC:-}" ]] && ENV_BLOCK+=$'\n''      SKILLSCALE_DIRECT_EXEC: "'"${SKILLSCALE_DIRECT_EXEC}"'"'
 # Default RUST_LOG if not set
 RUST_LOG="${RUST_LOG:-info,skill_server=debug}"
 ENV_BLOCK+=$'\n''      RUST_LOG: "'"${RUST_LOG}"'"'
@@ -319,6 +322,7 @@ services:
     environment:
       SKILLSCALE_BROKER_URL: "redpanda:29092"
       SKILLSCALE_GATEWAY_TIMEOUT: "${SKILLSCALE_GATEWAY_TIMEOUT:-600.0}"
+      SKILLSCALE_PRODUCER_LINGER_MS: "${SKILLSCALE_PRODUCER_LINGER_MS:-}"
       RUST_LOG: "info,gateway=debug"
     ports:
       - "8085:8085"
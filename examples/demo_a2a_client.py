@@ -26,21 +26,21 @@ from a2a_protocol.pydantic_v2 import (
 
 GATEWAY_URL = "http://127.0.0.1:8085"
 
+SAMPLE_CODE = (
+    "def process_data(data):\n"
+    "    count = 0\n"
+    "    for item in data:\n"
+    "        if item > 10:\n"
+    "            count += 1\n"
+    "            if count > 5:\n"
+    "                return True\n"
+    "    return False\n"
+)
 
-def main():
-    agent_id = "code-analysis"
-    url = f"{GATEWAY_URL}/v1/agents/{agent_id}/converse"
 
-    code_text = (
-        "def process_data(data):\n"
-        "    count = 0\n"
-        "    for item in data:\n"
-        "        if item > 10:\n"
-        "            count += 1\n"
-        "            if count > 5:\n"
-        "                return True\n"
-        "    return False\n"
-    )
+def build_request(agent_id):
+    """Return the converse URL and A2A TaskSendParams payload for one task."""
+    url = f"{GATEWAY_URL}/v1/agents/{agent_id}/converse"
 
     # A2A: only agent_id in the URL, no topic/skill metadata needed
     params = TaskSendParams(
@@ -48,18 +48,15 @@ def main():
         sessionId=f"session_{uuid.uuid4().hex[:8]}",
         message=Message(
             role=Role.user,
-            parts=[Part(root=TextPart(type="text", text=code_text))],
+            parts=[Part(root=TextPart(type="text", text=SAMPLE_CODE))],
         ),
     )
 
-    payload = params.model_dump(mode="json", exclude_none=True)
+    return url, params.model_dump(mode="json", exclude_none=True)
 
-    print("Starting A2A Client Demo...")
-    print(f"  Agent:   {agent_id}")
-    print(f"  Target:  {url}")
-    print(f"  Payload: {json.dumps(payload, indent=2)}")
-    print("-" * 50)
 
+def send_task(url, payload):
+    """POST a task to the gateway and return its decoded JSON response."""
     data = json.dumps(payload).encode("utf-8")
     req = urllib.request.Request(
         url,
@@ -68,12 +65,25 @@ def main():
         method="POST",
     )
 
+    timeout = int(float(os.environ.get('SKILLSCALE_GATEWAY_TIMEOUT', '600')))
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def main():
+    agent_id = "code-analysis"
+    url, payload = build_request(agent_id)
+
+    print("Starting A2A Client Demo...")
+    print(f"  Agent:   {agent_id}")
+    print(f"  Target:  {url}")
+    print(f"  Payload: {json.dumps(payload, indent=2)}")
+    print("-" * 50)
+
     try:
-        timeout = int(float(os.environ.get('SKILLSCALE_GATEWAY_TIMEOUT', '600')))
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            resp_data = json.loads(response.read().decode("utf-8"))
-            print("\n[A2A] Response:")
-            print(json.dumps(resp_data, indent=2))
+        resp_data = send_task(url, payload)
+        print("\n[A2A] Response:")
+        print(json.dumps(resp_data, indent=2))
     except Exception as e:
         print(f"A2A request failed: {e}")
         sys.exit(1)
@@ -1,7 +1,7 @@
 """
 MCP Client Demo — Connects to SkillScale Gateway via Streamable HTTP (SSE).
 
-The Gateway exposes MCP at http://localhost:8086/mcp.
+The Gateway exposes MCP at http://127.0.0.1:8086/mcp.
 No binary launch needed — just connect to the network port.
 
 Demonstrates two invocation modes:
@@ -19,7 +19,7 @@ import textwrap
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
-MCP_URL = "http://localhost:8086/mcp"
+MCP_URL = "http://127.0.0.1:8086/mcp"
 MCP_TIMEOUT = int(float(os.environ.get("SKILLSCALE_GATEWAY_TIMEOUT", "600")))
 
 SAMPLE_CODE = textwrap.dedent("""\
@@ -49,17 +49,21 @@ def _print_result(result):
     if result.isError:
         print(f"  ✗ Error: {result.content[0].text}")
         return
+    # Collect the output and write it in one call rather than a print per line
+    out = []
     for part in result.content:
-        # Indent multi-line text for readability
-        lines = part.text.strip().splitlines()
+        # Indent multi-line text for readability; strip and split only once
+        text = part.text.strip()
+        lines = text.splitlines()
         if len(lines) <= 3:
-            print(f"  {part.text.strip()}")
+            out.append(f"  {text}")
         else:
             # Print first 20 lines, truncate if longer
-            for line in lines[:20]:
-                print(f"  {line}")
+            out.extend(f"  {line}" for line in lines[:20])
             if len(lines) > 20:
-                print(f"  ... ({len(lines) - 20} more lines)")
+                out.append(f"  ... ({len(lines) - 20} more lines)")
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 async def main():
@@ -82,12 +86,26 @@ async def main():
             tools = await session.list_tools()
             agents, skills = [], []
             for t in tools.tools:
-                bucket = agents if t.name.startswith("agent__") else skills
-                bucket.append(t)
-                print(f"  {'🤖' if t.name.startswith('agent__') else '🔧'} {t.name}")
+                is_agent = t.name.startswith("agent__")
+                (agents if is_agent else skills).append(t)
+                print(f"  {'🤖' if is_agent else '🔧'} {t.name}")
             print(f"\n  Total: {len(agents)} agents, {len(skills)} skills")
             print()
 
+            # Both calls go out together over the one session, so the two
+            # skill executions overlap; their results are printed in order.
+            agent_result, skill_result = await asyncio.gather(
+                session.call_tool(
+                    "agent__code-analysis",
+                    arguments={"input": SAMPLE_CODE},
+                ),
+                session.call_tool(
+                    "code-analysis__dead-code-detector",
+                    arguments={"input": SAMPLE_CODE},
+                ),
+                return_exceptions=True,
+            )
+
             # ── 2. Agent-level call (coarse-grained) ─────────────────
             # The caller only says *which agent* to talk to.
             # The Skill Server reads AGENTS.md and auto-picks the best
@@ -97,14 +115,10 @@ async def main():
             print("  Mode:  coarse-grained — AGENTS.md picks the skill")
             print("  Input: Python snippet with unused import + dead code")
             print()
-            try:
-                result = await session.call_tool(
-                    "agent__code-analysis",
-                    arguments={"input": SAMPLE_CODE},
-                )
-                _print_result(result)
-            except Exception as e:
-                print(f"  ✗ Agent call failed: {e}")
+            if isinstance(agent_result, BaseException):
+                print(f"  ✗ Agent call failed: {agent_result}")
+            else:
+                _print_result(agent_result)
             print()
 
             # ── 3. Skill-level call (fine-grained) ───────────────────
@@ -115,14 +129,10 @@ async def main():
             print("  Mode:  fine-grained — directly invoke dead-code-detector")
             print("  Input: same Python snippet")
             print()
-            try:
-                result = await session.call_tool(
-                    "code-analysis__dead-code-detector",
-                    arguments={"input": SAMPLE_CODE},
-                )
-                _print_result(result)
-            except Exception as e:
-                print(f"  ✗ Skill call failed: {e}")
+            if isinstance(skill_result, BaseException):
+                print(f"  ✗ Skill call failed: {skill_result}")
+            else:
+                _print_result(skill_result)
             print()
 
             print("=" * 60)
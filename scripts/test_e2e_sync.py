@@ -1,81 +1,85 @@
 #!/usr/bin/env python3
 import subprocess
-import json
-import time
 import sys
-import re
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "examples"))
+import demo_a2a_client  # noqa: E402
+
+# Skill-server log lines that end an execution
+SUCCESS_MARKER = "Skill execution successful"
+FAILURE_MARKER = "Execution failed"
 
 def run_client():
     print("🚀 Triggering Skill Execution via Gateway...")
-    result = subprocess.run(
-        ["python3", "gateway/demo_a2a_client.py"],
-        capture_output=True,
-        text=True
-    )
-    if result.returncode != 0:
-        print("❌ Client failed")
-        print(result.stderr)
-        sys.exit(1)
-    
-    # Extract Task ID from output
-    # Looking for: "id": "task_..."
-    match = re.search(r'"id": "(task_[a-f0-9]+)"', result.stdout)
-    if not match:
-        print("❌ Could not find Task ID in client output")
-        print(result.stdout)
-        sys.exit(1)
-        
-    task_id = match.group(1)
-    print(f"✅ Application accepted task: {task_id}")
-    return task_id
+    # Drive the demo client in-process rather than spawning an interpreter
+    # for it: the task id is known as soon as the request is built, and the
+    # gateway call runs on a daemon thread while we follow the logs.
+    url, payload = demo_a2a_client.build_request("code-analysis")
+    task_id = payload["id"]
+
+    client = Future()
+    def send():
+        try:
+            client.set_result(demo_a2a_client.send_task(url, payload))
+        except Exception as e:
+            client.set_exception(e)
+    threading.Thread(target=send, daemon=True).start()
 
-def watch_logs(task_id):
+    print(f"✅ Submitted task: {task_id}")
+    return task_id, client
+
+def watch_logs(task_id, client):
     print(f"⏳ Waiting for Task {task_id} to complete...")
-    start_time = time.time()
     container = "skillscale-rust-skill-server-code-1"
-    
-    while True:
-        if time.time() - start_time > 120:
-            print("❌ Timeout waiting for execution")
-            sys.exit(1)
-            
-        # Fetch recent logs
-        result = subprocess.run(
-            ["docker", "logs", "--tail", "100", container],
-            capture_output=True,
-            text=True
-        )
-        logs = result.stdout + result.stderr
-        
-        # Check for completion markers associated with this task
-        # The logs show: Executing skill... then Skill execution successful
-        # We need to ensure it's OUR task. The log lines don't always print the Task ID on the success line
-        # but the executions are sequential in this queue.
-        
-        # Robust check: Look for "Received message: ... task_id" AND a SUBSEQUENT "Skill execution successful"
-        # For simplicity, we'll just look for the output appearing AFTER we started.
-        
-        if f'"id":"{task_id}"' in logs:
-            # Task was received. Now check for success/failure
-            if "Skill execution successful" in logs or "Execution failed" in logs:
-                # Find the log segment
-                lines = logs.splitlines()
-                for i, line in enumerate(lines):
-                    if f'"id":"{task_id}"' in line:
-                        # Found our request. Look forward for result.
-                        for j in range(i, len(lines)):
-                            if "Skill execution successful" in lines[j]:
-                                print("\n🎉 Execution Complete!")
-                                print("-" * 40)
-                                print("\n".join(lines[j:]))
-                                return
-                            if "Execution failed" in lines[j]:
-                                print("\n❌ Execution Failed!")
-                                print("\n".join(lines[j:]))
-                                sys.exit(1)
-        
-        time.sleep(2)
+
+    # Follow the container log as a stream instead of re-fetching the last
+    # 100 lines every 2s; --tail 100 still covers a task that finished
+    # before we attached.
+    proc = subprocess.Popen(
+        ["docker", "logs", "-f", "--tail", "100", container],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    )
+    # Stop following once the timeout passes; the kill ends the stream below
+    timer = threading.Timer(120, proc.kill)
+    timer.start()
+    # A client that fails after submitting (e.g. gateway unreachable) ends the
+    # log follow early instead of leaving it to the timeout
+    client.add_done_callback(lambda f: f.exception() and proc.kill())
+    try:
+        # The skill server tags its success/failure lines with the request
+        # id; other requests' executions can interleave in the same log.
+        request_marker = f'(req: {task_id})'
+        for line in proc.stdout:
+            if request_marker not in line:
+                continue
+            if SUCCESS_MARKER in line:
+                print("\n🎉 Execution Complete!")
+                print("-" * 40)
+                print(line, end="")
+                return
+            if FAILURE_MARKER in line:
+                print("\n❌ Execution Failed!")
+                print(line, end="")
+                sys.exit(1)
+    finally:
+        timer.cancel()
+        proc.kill()
+        proc.wait()
+
+    if client.done() and client.exception():
+        print(f"❌ Client failed: {client.exception()}")
+        sys.exit(1)
+    print("❌ Timeout waiting for execution")
+    sys.exit(1)
 
 if __name__ == "__main__":
-    task_id = run_client()
-    watch_logs(task_id)
+    # The result is already in the logs once watch_logs returns; the client's
+    # daemon thread is not waited for
+    task_id, client = run_client()
+    watch_logs(task_id, client)
@@ -13,6 +13,7 @@ Usage in a skill script:
 
 import os
 import sys
+import threading
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -91,15 +92,26 @@ def _build_client():
 # Lazy singleton
 _client = None
 _model = None
+_client_lock = threading.Lock()
 
 
 def _get_client():
     global _client, _model
+    # Double-checked: once built, callers read the globals without locking;
+    # concurrent first callers build the client only once.
     if _client is None:
-        _client, _model = _build_client()
+        with _client_lock:
+            if _client is None:
+                client, _model = _build_client()
+                _client = client
     return _client, _model
 
 
+def _stop_kwargs(stop):
+    """Only send `stop` when set; not every provider accepts a null value."""
+    return {"stop": stop} if stop else {}
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -110,6 +122,7 @@ def chat(
     *,
     max_tokens: int = 4096,
     temperature: float = 0.3,
+    stop: list[str] | None = None,
 ) -> str:
     """
     Send a chat completion request and return the assistant's reply.
@@ -119,6 +132,8 @@ def chat(
         user_message:  The user's input / data to process.
         max_tokens:    Maximum tokens in the response.
         temperature:   Sampling temperature (lower = more deterministic).
+        stop:          Sequences that end generation early, e.g. ["\n"]
+                       when only a single-line answer is wanted.
 
     Returns:
         The assistant's response text.
@@ -132,6 +147,7 @@ def chat(
         ],
         max_tokens=max_tokens,
         temperature=temperature,
+        **_stop_kwargs(stop),
     )
     return response.choices[0].message.content.strip()
 
@@ -141,6 +157,7 @@ def chat_with_messages(
     *,
     max_tokens: int = 4096,
     temperature: float = 0.3,
+    stop: list[str] | None = None,
 ) -> str:
     """
     Send a multi-turn chat completion request.
@@ -149,6 +166,7 @@ def chat_with_messages(
         messages: List of {"role": ..., "content": ...} dicts.
         max_tokens: Maximum tokens in the response.
         temperature: Sampling temperature.
+        stop: Sequences that end generation early.
 
     Returns:
         The assistant's response text.
@@ -159,6 +177,7 @@ def chat_with_messages(
         messages=messages,
         max_tokens=max_tokens,
         temperature=temperature,
+        **_stop_kwargs(stop),
     )
     return response.choices[0].message.content.strip()
 
@@ -1,6 +1,10 @@
+use rdkafka::config::ClientConfig;
 use serde::{Deserialize, Serialize};
 use serde_json::Value;
 use std::collections::HashMap;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex, OnceLock};
+use tokio::sync::oneshot;
 
 // --- A2A / JSON-RPC Wrappers ---
 
@@ -24,8 +28,11 @@ pub struct JsonRpcResponse<T> {
 #[serde(rename_all = "camelCase")]
 pub struct SendTaskParams {
     pub id: String,
+    // Omitted from the wire when unset; missing fields deserialize as None
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub session_id: Option<String>,
     pub message: Message,
+    #[serde(skip_serializing_if = "Option::is_none")]
     pub metadata: Option<HashMap<String, String>>,
 }
 
@@ -93,3 +100,84 @@ pub struct SkillContext {
     #[serde(flatten)]
     pub extra: HashMap<String, Value>,
 }
+
+// --- Topic Naming ---
+
+/// Kafka topic serving a skill category, e.g. `data-processing` -> `TOPIC_DATA_PROCESSING`.
+/// Builds the name in a single pass instead of uppercase + replace + format.
+pub fn topic_for_category(category: &str) -> String {
+    let mut topic = String::with_capacity("TOPIC_".len() + category.len());
+    topic.push_str("TOPIC_");
+    for c in category.chars() {
+        if c == '-' {
+            topic.push('_');
+        } else {
+            topic.extend(c.to_uppercase());
+        }
+    }
+    topic
+}
+
+// --- Kafka Producers ---
+
+/// Producer settings shared by the gateway, skill server and stdio MCP
+/// server. Requests and replies are small, so they are sent without Nagle's
+/// delay. SKILLSCALE_PRODUCER_LINGER_MS sets linger.ms, letting librdkafka
+/// batch concurrent sends into one produce request; unset or empty keeps
+/// librdkafka's default.
+pub fn producer_config(broker_url: &str) -> ClientConfig {
+    let mut config = ClientConfig::new();
+    config
+        .set("bootstrap.servers", broker_url)
+        .set("message.timeout.ms", "5000")
+        .set("socket.nagle.disable", "true");
+    if let Some(linger_ms) = std::env::var("SKILLSCALE_PRODUCER_LINGER_MS").ok().filter(|v| !v.is_empty()) {
+        config.set("linger.ms", linger_ms);
+    }
+    config
+}
+
+// --- Request IDs ---
+
+/// Request id unique within this process: a random prefix drawn once at
+/// startup followed by a counter. Replies are already scoped to the
+/// caller's own reply topic, so this avoids a fresh v4 UUID per request.
+pub fn next_request_id() -> String {
+    static PREFIX: OnceLock<String> = OnceLock::new();
+    static COUNTER: AtomicU64 = AtomicU64::new(0);
+
+    let prefix = PREFIX.get_or_init(|| uuid::Uuid::new_v4().simple().to_string()[..8].to_string());
+    format!("{}{:012x}", prefix, COUNTER.fetch_add(1, Ordering::Relaxed))
+}
+
+// --- Pending Replies ---
+
+// Map request_id -> oneshot::Sender awaiting the skill reply
+pub type PendingMap = Arc<Mutex<HashMap<String, oneshot::Sender<Value>>>>;
+
+// Initial capacity for a PendingMap. Entries are inserted by register_pending
+// on the request path; pre-sizing keeps a burst of in-flight requests from
+// growing (and rehashing) the map while that insert holds the lock.
+pub const PENDING_CAPACITY: usize = 64;
+
+/// Removes a request's pending entry when dropped, so it is cleaned up on
+/// every exit path, including the caller's future being cancelled mid-wait.
+pub struct PendingGuard<'a> {
+    pending: &'a PendingMap,
+    request_id: &'a str,
+}
+
+impl Drop for PendingGuard<'_> {
+    fn drop(&mut self) {
+        if let Ok(mut map) = self.pending.lock() {
+            map.remove(self.request_id);
+        }
+    }
+}
+
+/// Register a waiter for `request_id`; the entry lives as long as the guard.
+pub fn register_pending<'a>(pending: &'a PendingMap, request_id: &'a str) -> (PendingGuard<'a>, oneshot::Receiver<Value>) {
+    let (tx, rx) = oneshot::channel();
+    pending.lock().unwrap().insert(request_id.to_string(), tx);
+    (PendingGuard { pending, request_id }, rx)
+}
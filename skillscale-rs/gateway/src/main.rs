@@ -7,15 +7,14 @@ use std::net::SocketAddr;
 use std::sync::{Arc, Mutex};
 use std::collections::HashMap;
 use std::time::Duration;
-use tracing::{info, warn, error};
+use tracing::{debug, info, warn, error};
 use serde_json::{Value, json};
-use common::SendTaskParams;
+use common::{producer_config, register_pending, PendingMap, SendTaskParams, topic_for_category, PENDING_CAPACITY};
 use rdkafka::config::ClientConfig;
 use rdkafka::producer::{FutureProducer, FutureRecord};
-use rdkafka::consumer::{Consumer, StreamConsumer};
+use rdkafka::consumer::{BaseConsumer, Consumer};
 use rdkafka::message::Message as KafkaMessage;
 use rdkafka::util::Timeout;
-use tokio::sync::oneshot;
 use clap::Parser;
 
 mod mcp_server;
@@ -28,11 +27,21 @@ struct Args {
     mcp: bool,
 }
 
+// Fixed error messages returned to A2A/MCP callers.
+pub const ERR_CHANNEL_CLOSED: &str = "Channel closed unexpectedly";
+pub const ERR_SKILL_TIMEOUT: &str = "Skill execution timeout";
+pub const ERR_PRODUCE: &str = "Internal error producing message";
+
+// How long the reply consumer thread blocks in poll before looping
+const REPLY_POLL_TIMEOUT: Duration = Duration::from_millis(100);
+
+// Most replies handed to dispatch_replies in one pass
+const REPLY_BATCH_MAX: usize = 64;
+
 pub struct AppState {
     pub producer: FutureProducer,
     pub reply_topic: String,
-    // Map request_id -> oneshot::Sender
-    pub pending_requests: Arc<Mutex<HashMap<String, oneshot::Sender<Value>>>>,
+    pub pending_requests: PendingMap,
     pub gateway_timeout: Duration,
 }
 
@@ -65,68 +74,65 @@ async fn main() {
     let group_id = format!("gateway-group-{}", uuid::Uuid::new_v4());
     let reply_topic = format!("gateway-replies-{}", uuid::Uuid::new_v4());
 
-    let producer: FutureProducer = ClientConfig::new()
-        .set("bootstrap.servers", &broker_url)
-        .set("message.timeout.ms", "5000")
+    let producer: FutureProducer = producer_config(&broker_url)
         .create()
         .expect("Producer creation error");
 
-    let pending_requests: Arc<Mutex<HashMap<String, oneshot::Sender<Value>>>> = Arc::new(Mutex::new(HashMap::new()));
+    let pending_requests: PendingMap = Arc::new(Mutex::new(HashMap::with_capacity(PENDING_CAPACITY)));
     let pending_requests_clone = pending_requests.clone();
 
-    // Start Reply Consumer in background task
+    // Start Reply Consumer on a dedicated thread
     let reply_topic_clone = reply_topic.clone();
     let broker_url_clone = broker_url.clone();
     
     // Disable Kafka reply listener only in MCP stdio mode (stdout conflicts)
     // In normal mode and MCP SSE mode, we need the reply consumer
     if !args.mcp {
-        tokio::spawn(async move {
-            info!("Starting Reply Consumer on topic: {}", reply_topic_clone);
-            
-            let consumer: StreamConsumer = ClientConfig::new()
-                .set("group.id", &group_id)
-                .set("bootstrap.servers", &broker_url_clone)
-                .set("enable.partition.eof", "false")
-                .set("session.timeout.ms", "6000")
-                .set("enable.auto.commit", "true")
-                .set("auto.offset.reset", "earliest")
-                .create()
-                .expect("Consumer creation failed");
+        // The listener only moves bytes from Kafka to oneshot senders, so it
+        // blocks in librdkafka's poll on its own OS thread instead of going
+        // through a runtime wakeup per message.
+        std::thread::Builder::new()
+            .name("reply-consumer".to_string())
+            .spawn(move || {
+                info!("Starting Reply Consumer on topic: {}", reply_topic_clone);
+                
+                let consumer: BaseConsumer = ClientConfig::new()
+                    .set("group.id", &group_id)
+                    .set("bootstrap.servers", &broker_url_clone)
+                    .set("enable.partition.eof", "false")
+                    .set("socket.nagle.disable", "true")
+                    .set("session.timeout.ms", "6000")
+                    .set("enable.auto.commit", "true")
+                    .set("auto.offset.reset", "earliest")
+                    .create()
+                    .expect("Consumer creation failed");
 
-            if let Err(e) = consumer.subscribe(&[&reply_topic_clone]) {
-                error!("Failed to subscribe to reply topic: {}", e);
-                return;
-            }
+                if let Err(e) = consumer.subscribe(&[&reply_topic_clone]) {
+                    error!("Failed to subscribe to reply topic: {}", e);
+                    return;
+                }
 
-            loop {
-                match consumer.recv().await {
-                    Err(e) => warn!("Kafka error: {}", e),
-                    Ok(m) => {
-                        let payload = match m.payload_view::<str>() {
-                            None => "",
-                            Some(Ok(s)) => s,
-                            Some(Err(_)) => "",
-                        };
-                        
-                        if !payload.is_empty() {
-                             info!("Received reply: {}", payload);
-                             if let Ok(json_val) = serde_json::from_str::<Value>(payload) {
-                                 if let Some(meta) = json_val.get("metadata") {
-                                     if let Some(req_id) = meta.get("request_id").and_then(|v| v.as_str()) {
-                                         let mut map = pending_requests_clone.lock().unwrap();
-                                         info!("Looking for req_id: {}, keys in map: {:?}", req_id, map.keys().collect::<Vec<_>>());
-                                         if let Some(tx) = map.remove(req_id) {
-                                             let _ = tx.send(json_val);
-                                         }
-                                     }
-                                 }
-                             }
+                let mut batch = Vec::with_capacity(REPLY_BATCH_MAX);
+                loop {
+                    match consumer.poll(REPLY_POLL_TIMEOUT) {
+                        None => continue,
+                        Some(Err(e)) => { warn!("Kafka error: {}", e); continue; }
+                        Some(Ok(m)) => batch.push(m),
+                    }
+                    // Replies tend to arrive in bursts: drain whatever is already
+                    // fetched without blocking and resolve the lot in one pass.
+                    while batch.len() < REPLY_BATCH_MAX {
+                        match consumer.poll(Duration::ZERO) {
+                            None => break,
+                            Some(Err(e)) => warn!("Kafka error: {}", e),
+                            Some(Ok(m)) => batch.push(m),
                         }
                     }
+                    dispatch_replies(&pending_requests_clone, &batch);
+                    batch.clear();
                 }
-            }
-        });
+            })
+            .expect("Failed to spawn reply consumer thread");
     }
 
     let state = Arc::new(AppState {
@@ -159,6 +165,62 @@ async fn main() {
     axum::serve(listener, app).await.unwrap();
 }
 
+/// Hand a batch of skill replies to the requests waiting for them.
+fn dispatch_replies<M: KafkaMessage>(pending: &PendingMap, batch: &[M]) {
+    // Skill servers key replies by request_id: claim every waiter in the
+    // batch under one lock, so keyed replies are parsed only once claimed.
+    let mut claimed = Vec::with_capacity(batch.len());
+    let mut unmatched = Vec::new();
+    {
+        let mut map = pending.lock().unwrap();
+        for m in batch {
+            let payload = m.payload().unwrap_or_default();
+            if payload.is_empty() {
+                continue;
+            }
+            // A reply without a key, or whose key is not a pending request id
+            // (a responder may use its own key), is matched on its metadata
+            let tx = m.key()
+                .and_then(|k| std::str::from_utf8(k).ok())
+                .and_then(|req_id| Some((req_id, map.remove(req_id)?)));
+            match tx {
+                Some((req_id, tx)) => claimed.push((req_id, tx, payload)),
+                None => unmatched.push(payload),
+            }
+        }
+    }
+    debug!("Dispatching {} reply(ies), {} unmatched by key", claimed.len(), unmatched.len());
+
+    // Parse straight from the message bytes, outside the lock; serde_json
+    // validates UTF-8 as it goes, so no separate str view is needed.
+    for (req_id, tx, payload) in claimed {
+        match serde_json::from_slice::<Value>(payload) {
+            Ok(json_val) => { let _ = tx.send(json_val); }
+            Err(e) => warn!("Malformed reply for {}: {}", req_id, e),
+        }
+    }
+
+    // Replies not matched by key: fall back to metadata.request_id
+    if unmatched.is_empty() {
+        return;
+    }
+    let parsed: Vec<Value> = unmatched
+        .into_iter()
+        .filter_map(|payload| serde_json::from_slice::<Value>(payload).ok())
+        .collect();
+    let mut map = pending.lock().unwrap();
+    for json_val in parsed {
+        let tx = json_val
+            .get("metadata")
+            .and_then(|meta| meta.get("request_id"))
+            .and_then(|v| v.as_str())
+            .and_then(|req_id| map.remove(req_id));
+        if let Some(tx) = tx {
+            let _ = tx.send(json_val);
+        }
+    }
+}
+
 async fn handle_converse(
     Path(agent_id): Path<String>,
     State(state): State<Arc<AppState>>,
@@ -166,7 +228,7 @@ async fn handle_converse(
 ) -> Json<Value> {
     info!("Received converse request for agent: {} (ID: {})", agent_id, params.id);
     
-    let topic = format!("TOPIC_{}", agent_id.replace("-", "_").to_uppercase());
+    let topic = topic_for_category(&agent_id);
     info!("Routing to topic: {}", topic);
 
     // Inject reply_to and request_id into metadata
@@ -179,14 +241,10 @@ async fn handle_converse(
         meta.insert("skill".to_string(), agent_id.clone()); // also inject skill name
     }
 
-    let payload_json = serde_json::to_string(&params).unwrap_or_default();
+    let payload_json = serde_json::to_vec(&params).unwrap_or_default();
     
     // Create channel to wait for response
-    let (tx, rx) = oneshot::channel();
-    {
-        let mut map = state.pending_requests.lock().unwrap();
-        map.insert(params.id.clone(), tx);
-    }
+    let (_pending, rx) = register_pending(&state.pending_requests, &params.id);
 
     let record = FutureRecord::to(&topic)
         .key(&agent_id)
@@ -224,33 +282,25 @@ async fn handle_converse(
                     Json(json!({
                         "jsonrpc": "2.0",
                         "id": params.id,
-                        "error": { "code": -32603, "message": "Channel closed unexpectedly" }
+                        "error": { "code": -32603, "message": ERR_CHANNEL_CLOSED }
                     }))
                 },
                 Err(_) => {
                     // Timeout
-                    {
-                        let mut map = state.pending_requests.lock().unwrap();
-                        map.remove(&params.id);
-                    }
                      Json(json!({
                         "jsonrpc": "2.0",
                         "id": params.id,
-                        "error": { "code": -32000, "message": "Skill execution timeout" }
+                        "error": { "code": -32000, "message": ERR_SKILL_TIMEOUT }
                     }))
                 }
             }
         },
         Err((e, _)) => {
             error!("Failed to produce message: {}", e);
-            {
-                 let mut map = state.pending_requests.lock().unwrap();
-                 map.remove(&params.id);
-            }
             Json(json!({
                 "jsonrpc": "2.0",
                 "id": params.id,
-                "error": { "code": -32603, "message": "Internal error producing message" }
+                "error": { "code": -32603, "message": ERR_PRODUCE }
             }))
         }
     }
@@ -1,12 +1,13 @@
-use std::sync::Arc;
-use tokio::sync::oneshot;
-use std::collections::HashMap;
+use std::borrow::Cow;
+use std::sync::{Arc, OnceLock};
+use tokio::sync::OnceCell;
+use std::collections::{HashMap, HashSet};
 use std::time::Duration;
 use tracing::{info, error};
 use rdkafka::producer::FutureRecord;
 use rdkafka::util::Timeout;
-use common::{SendTaskParams, Message as TransMessage, Part, Role as TransRole};
-use crate::AppState;
+use common::{next_request_id, register_pending, topic_for_category, SendTaskParams, Message as TransMessage, Part, Role as TransRole};
+use crate::{AppState, ERR_CHANNEL_CLOSED, ERR_SKILL_TIMEOUT};
 use crate::skill_discovery;
 
 use rmcp::{
@@ -35,10 +36,10 @@ impl GatewayMcpServer {
         category: &str,
         skill_name: &str,
         input: &str,
-    ) -> Result<String, String> {
-        let topic = format!("TOPIC_{}", category.to_uppercase().replace("-", "_"));
+    ) -> Result<String, Cow<'static, str>> {
+        let topic = topic_for_category(category);
 
-        let task_id = uuid::Uuid::new_v4().to_string();
+        let task_id = next_request_id();
         
         // Add metadata required by skill servers
         // If skill_name is empty, the skillserver automatically uses AGENTS.md for matching (agent mode)
@@ -57,18 +58,14 @@ impl GatewayMcpServer {
             metadata: Some(meta),
         };
 
-        let payload_json = serde_json::to_string(&params).unwrap_or_default();
+        let payload_json = serde_json::to_vec(&params).unwrap_or_default();
         if skill_name.is_empty() {
             info!("Invoking agent {} on topic {}", category, topic);
         } else {
             info!("Invoking skill {}/{} on topic {}", category, skill_name, topic);
         }
         
-        let (tx, rx) = oneshot::channel();
-        {
-            let mut map = self.state.pending_requests.lock().unwrap();
-            map.insert(task_id.clone(), tx);
-        }
+        let (_pending, rx) = register_pending(&self.state.pending_requests, &task_id);
 
         let record = FutureRecord::to(&topic)
             .key(skill_name)
@@ -84,23 +81,11 @@ impl GatewayMcpServer {
                             .to_string();
                         Ok(result_str)
                     },
-                    Ok(Err(_)) => Err("Channel closed unexpectedly".to_string()),
-                    Err(_) => {
-                        {
-                            let mut map = self.state.pending_requests.lock().unwrap();
-                            map.remove(&task_id);
-                        }
-                        Err("Skill execution timeout".to_string())
-                    }
+                    Ok(Err(_)) => Err(Cow::Borrowed(ERR_CHANNEL_CLOSED)),
+                    Err(_) => Err(Cow::Borrowed(ERR_SKILL_TIMEOUT)),
                 }
             },
-            Err((e, _)) => {
-               {
-                   let mut map = self.state.pending_requests.lock().unwrap();
-                   map.remove(&task_id);
-               }
-               Err(format!("Failed to produce message: {}", e))
-            }
+            Err((e, _)) => Err(Cow::Owned(format!("Failed to produce message: {}", e))),
         }
     }
 }
@@ -109,8 +94,12 @@ impl GatewayMcpServer {
 // Note: sampling_stdio.rs doesn't use #[async_trait] and uses regular async fn (Rust 1.75+ maybe).
 impl ServerHandler for GatewayMcpServer {
     fn get_info(&self) -> ServerInfo {
-        ServerInfo::new(ServerCapabilities::builder().enable_tools().build())
-            .with_instructions("Gateway MCP Server")
+        SERVER_INFO
+            .get_or_init(|| {
+                ServerInfo::new(ServerCapabilities::builder().enable_tools().build())
+                    .with_instructions("Gateway MCP Server")
+            })
+            .clone()
     }
 
     async fn list_tools(
@@ -118,73 +107,7 @@ impl ServerHandler for GatewayMcpServer {
         _request: Option<PaginatedRequestParams>,
         _context: RequestContext<RoleServer>,
     ) -> Result<ListToolsResult, ErrorData> {
-        let mut tools = vec![
-            Tool::new(
-                "ping",
-                "Ping the server",
-                Arc::new(
-                    serde_json::from_value(serde_json::json!({
-                        "type": "object",
-                        "properties": {}
-                    }))
-                    .unwrap(),
-                ),
-            )
-        ];
-
-        // The gateway is run from the `skillscale-rs/gateway` directory or from the root.
-        // Let's check both or use an absolute approach if possible.
-        // Usually it's executed from the project root in our compose/scripts:
-        let root1 = std::path::Path::new("skills");
-        let root2 = std::path::Path::new("../../skills");
-        
-        // Discover agents
-        let discovered_agents = if root1.exists() {
-            skill_discovery::discover_agents(root1)
-        } else {
-            skill_discovery::discover_agents(root2)
-        };
-        
-        for agent in discovered_agents {
-            tools.push(Tool::new(
-                format!("agent__{}", agent.category),
-                agent.description.clone(),
-                Arc::new(
-                    serde_json::from_value(serde_json::json!({
-                        "type": "object",
-                        "properties": {
-                            "input": { "type": "string" }
-                        },
-                        "required": ["input"]
-                    }))
-                    .unwrap(),
-                ),
-            ));
-        }
-
-        // Discover specific skills
-        let discovered_skills = if root1.exists() {
-            skill_discovery::discover_skills(root1)
-        } else {
-            skill_discovery::discover_skills(root2)
-        };
-        
-        for skill in discovered_skills {
-            tools.push(Tool::new(
-                format!("{}__{}", skill.category, skill.name),
-                skill.description.clone(),
-                Arc::new(
-                    serde_json::from_value(serde_json::json!({
-                        "type": "object",
-                        "properties": {
-                            "input": { "type": "string" }
-                        },
-                        "required": ["input"]
-                    }))
-                    .unwrap(),
-                ),
-            ));
-        }
+        let tools = TOOL_CATALOG.get_or_try_init(build_tool_catalog).await?.tools.clone();
 
         Ok(ListToolsResult {
             tools,
@@ -205,6 +128,14 @@ impl ServerHandler for GatewayMcpServer {
             return Ok(CallToolResult::success(vec![Content::text("Pong".to_string())]));
         }
 
+        // Reject unknown tools up front rather than publishing to a topic no
+        // skill server consumes and waiting out the gateway timeout. If
+        // discovery found nothing, fall through and let Kafka routing decide.
+        let catalog = TOOL_CATALOG.get_or_try_init(build_tool_catalog).await?;
+        if !catalog.names.is_empty() && !catalog.names.contains(&*tool_name) {
+            return Err(ErrorData::new(ErrorCode::METHOD_NOT_FOUND, "Tool not found", None));
+        }
+
         if let Some(cat) = tool_name.strip_prefix("agent__") {
              let input = args.get("input").and_then(|v| v.as_str()).unwrap_or("");
              match self.invoke_kafka(cat, "", input).await {
@@ -221,8 +152,94 @@ impl ServerHandler for GatewayMcpServer {
              }
         }
 
-        Err(ErrorData::new(ErrorCode::METHOD_NOT_FOUND, "Tool not found".to_string(), None))
+        Err(ErrorData::new(ErrorCode::METHOD_NOT_FOUND, "Tool not found", None))
+    }
+}
+
+/// Server info returned on every MCP `initialize`; it never changes, so it is
+/// built once and cloned per session.
+static SERVER_INFO: OnceLock<ServerInfo> = OnceLock::new();
+
+/// MCP tool catalog derived from `skills/*/AGENTS.md`, built on first
+/// `list_tools`/`call_tool` and shared by every MCP session.
+///
+/// Discovery runs once per process: a category or skill added under
+/// `skills/` afterwards is neither listed nor callable (call_tool answers
+/// METHOD_NOT_FOUND) until the gateway is restarted.
+static TOOL_CATALOG: OnceCell<ToolCatalog> = OnceCell::const_new();
+
+struct ToolCatalog {
+    tools: Vec<Tool>,
+    // Names of the discovered agent/skill tools, for call_tool lookups
+    names: HashSet<String>,
+}
+
+async fn build_tool_catalog() -> Result<ToolCatalog, ErrorData> {
+    let mut tools = vec![
+        Tool::new(
+            "ping",
+            "Ping the server",
+            Arc::new(
+                serde_json::from_value(serde_json::json!({
+                    "type": "object",
+                    "properties": {}
+                }))
+                .unwrap(),
+            ),
+        )
+    ];
+
+    // Every agent/skill tool takes the same `{ input: string }` arguments,
+    // so all of them share a single schema allocation.
+    let input_schema: Arc<JsonObject> = Arc::new(
+        serde_json::from_value(serde_json::json!({
+            "type": "object",
+            "properties": {
+                "input": { "type": "string" }
+            },
+            "required": ["input"]
+        }))
+        .unwrap(),
+    );
+
+    // Directory scanning and AGENTS.md parsing are blocking filesystem
+    // calls; run them on tokio's shared blocking pool so they never stall
+    // a runtime worker that is also serving MCP/A2A requests.
+    let (discovered_agents, discovered_skills) = tokio::task::spawn_blocking(|| {
+        // The gateway is run from the `skillscale-rs/gateway` directory or from the root.
+        // Let's check both or use an absolute approach if possible.
+        // Usually it's executed from the project root in our compose/scripts:
+        let root1 = std::path::Path::new("skills");
+        let root2 = std::path::Path::new("../../skills");
+        let root = if root1.exists() { root1 } else { root2 };
+
+        skill_discovery::discover(root)
+    })
+    .await
+    .map_err(|e| ErrorData::new(ErrorCode::INTERNAL_ERROR, e.to_string(), None))?;
+
+    for agent in discovered_agents {
+        tools.push(Tool::new(
+            format!("agent__{}", agent.category),
+            agent.description,
+            input_schema.clone(),
+        ));
+    }
+
+    for skill in discovered_skills {
+        tools.push(Tool::new(
+            format!("{}__{}", skill.category, skill.name),
+            skill.description,
+            input_schema.clone(),
+        ));
     }
+
+    let names = tools.iter()
+        .skip(1) // ping
+        .map(|tool| tool.name.to_string())
+        .collect();
+
+    Ok(ToolCatalog { tools, names })
 }
 
 pub async fn run_stdio_server(state: Arc<AppState>) {
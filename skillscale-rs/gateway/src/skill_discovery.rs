@@ -1,5 +1,6 @@
 use std::fs;
-use std::path::Path;
+use std::path::{Path, PathBuf};
+use std::sync::Arc;
 use serde::{Serialize, Deserialize};
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -10,83 +11,110 @@ pub struct AgentDef {
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct SkillDef {
-    pub category: String,
+    // Shared by every skill of the category instead of copied per skill
+    pub category: Arc<str>,
     pub name: String,
     pub description: String,
 }
 
-pub fn discover_agents(skills_root: &Path) -> Vec<AgentDef> {
-    let mut agents = Vec::new();
+/// Agents and skills under `skills_root`, from a single pass over the
+/// category directories: each AGENTS.md is read once and yields both the
+/// agent description and the skills it lists.
+pub fn discover(skills_root: &Path) -> (Vec<AgentDef>, Vec<SkillDef>) {
+    let mut categories = Vec::new();
 
     if let Ok(entries) = fs::read_dir(skills_root) {
         for entry in entries.filter_map(Result::ok) {
-            let path = entry.path();
-            if path.is_dir() {
+            if is_dir_entry(&entry) {
                 // Assume directory name is the category
-                let category = path.file_name()
-                    .and_then(|n| n.to_str())
-                    .unwrap_or("unknown")
-                    .to_string();
-
-                let agents_path = path.join("AGENTS.md");
-                if agents_path.exists() {
-                    if let Ok(content) = fs::read_to_string(agents_path) {
-                        let description = extract_agent_description(&content);
-                        agents.push(AgentDef {
-                            category,
-                            description,
-                        });
-                    }
-                }
+                let category: Arc<str> = category_name(&entry).into();
+                categories.push((category, entry.path().join("AGENTS.md")));
             }
         }
     }
 
-    agents
-}
+    let loaded = load_categories(&categories);
 
-pub fn discover_skills(skills_root: &Path) -> Vec<SkillDef> {
+    let mut agents = Vec::with_capacity(loaded.len());
     let mut skills = Vec::new();
+    for (category, defs) in loaded {
+        agents.push(AgentDef {
+            category: category.to_string(),
+            description: defs.description,
+        });
+        skills.extend(defs.skills);
+    }
+    (agents, skills)
+}
 
-    if let Ok(entries) = fs::read_dir(skills_root) {
-        for entry in entries.filter_map(Result::ok) {
-            let path = entry.path();
-            if path.is_dir() {
-                // Assume directory name is the category
-                let category = path.file_name()
-                    .and_then(|n| n.to_str())
-                    .unwrap_or("unknown")
-                    .to_string();
-
-                let agents_path = path.join("AGENTS.md");
-                if agents_path.exists() {
-                    if let Ok(content) = fs::read_to_string(agents_path) {
-                        let parsed_skills = parse_agents_md(&category, &content);
-                        skills.extend(parsed_skills);
-                    }
-                }
-            }
+/// What one category's AGENTS.md defines.
+struct CategoryDefs {
+    description: String,
+    skills: Vec<SkillDef>,
+}
+
+/// Load each category that has an AGENTS.md, in order.
+fn load_categories(categories: &[(Arc<str>, PathBuf)]) -> Vec<(Arc<str>, CategoryDefs)> {
+    categories.iter()
+        .filter_map(|(category, agents_path)| {
+            Some((category.clone(), load_category(category, agents_path)?))
+        })
+        .collect()
+}
+
+/// Agent description and skills from one category's AGENTS.md; `None`
+/// when the category has no readable AGENTS.md.
+fn load_category(category: &Arc<str>, agents_path: &Path) -> Option<CategoryDefs> {
+    let content = fs::read_to_string(agents_path).ok()?;
+    Some(CategoryDefs {
+        description: extract_agent_description(&content),
+        skills: parse_agents_md(category, &content),
+    })
+}
+
+// Directories that never hold a skill category, skipped (like any hidden
+// directory) before they are stat'ed or probed for an AGENTS.md
+const IGNORED_DIRS: &[&str] = &["__pycache__", "node_modules", "venv"];
+
+/// Whether a directory entry is a directory, using the file type read
+/// alongside the entry instead of a separate stat. Symlinks are still
+/// followed, as `Path::is_dir` did. Hidden and ignored directories are
+/// rejected by name first.
+fn is_dir_entry(entry: &fs::DirEntry) -> bool {
+    let name = entry.file_name();
+    if let Some(name) = name.to_str() {
+        if name.starts_with('.') || IGNORED_DIRS.contains(&name) {
+            return false;
         }
     }
+    match entry.file_type() {
+        Ok(ft) if ft.is_symlink() => entry.path().is_dir(),
+        Ok(ft) => ft.is_dir(),
+        Err(_) => false,
+    }
+}
 
-    skills
+fn category_name(entry: &fs::DirEntry) -> String {
+    entry.file_name()
+        .to_str()
+        .unwrap_or("unknown")
+        .to_string()
 }
 
-fn parse_agents_md(category: &str, content: &str) -> Vec<SkillDef> {
+fn parse_agents_md(category: &Arc<str>, content: &str) -> Vec<SkillDef> {
     let mut skills = Vec::new();
     
-    let v: Vec<&str> = content.split("<skill>").collect();
-    
-    for chunk in v.iter().skip(1) {
+    // Walk the <skill> blocks lazily; no intermediate Vec of chunks
+    for chunk in content.split("<skill>").skip(1) {
         if let Some(end_idx) = chunk.find("</skill>") {
             let skill_block = &chunk[0..end_idx];
             
-            let name = extract_tag(skill_block, "name");
-            let description = extract_tag(skill_block, "description");
+            let name = extract_tag(skill_block, NAME_TAG);
+            let description = extract_tag(skill_block, DESCRIPTION_TAG);
             
             if let (Some(name), Some(description)) = (name, description) {
                 skills.push(SkillDef {
-                    category: category.to_string(),
+                    category: Arc::clone(category),
                     name: name.trim().to_string(),
                     description: description.trim().to_string(),
                 });
@@ -97,18 +125,19 @@ fn parse_agents_md(category: &str, content: &str) -> Vec<SkillDef> {
     skills
 }
 
-fn extract_tag(content: &str, tag_name: &str) -> Option<String> {
-    let open_tag = format!("<{}>", tag_name);
-    let close_tag = format!("</{}>", tag_name);
-    
-    if let Some(start) = content.find(&open_tag) {
-        if let Some(end) = content.find(&close_tag) {
-            if start + open_tag.len() < end {
-                return Some(content[start + open_tag.len()..end].to_string());
-            }
-        }
+// (open, close) tag pairs extracted from each <skill> block
+const NAME_TAG: (&str, &str) = ("<name>", "</name>");
+const DESCRIPTION_TAG: (&str, &str) = ("<description>", "</description>");
+
+/// Borrow the text between the first open tag and the close tag after it.
+fn extract_tag<'a>(content: &'a str, (open_tag, close_tag): (&str, &str)) -> Option<&'a str> {
+    let start = content.find(open_tag)? + open_tag.len();
+    let end = start + content[start..].find(close_tag)?;
+    if start < end {
+        Some(&content[start..end])
+    } else {
+        None
     }
-    None
 }
 
 fn extract_agent_description(content: &str) -> String {
@@ -1,4 +1,5 @@
 use anyhow::Result;
+use common::{next_request_id, producer_config, register_pending, topic_for_category, PendingMap, PENDING_CAPACITY};
 use rdkafka::config::ClientConfig;
 use rdkafka::consumer::{Consumer, StreamConsumer};
 use rdkafka::message::Message;
@@ -6,11 +7,13 @@ use rdkafka::producer::{FutureProducer, FutureRecord};
 use rdkafka::util::Timeout;
 use serde::{Deserialize, Serialize};
 use serde_json::{json, Value};
+use std::borrow::Cow;
 use std::collections::HashMap;
-use std::sync::{Arc, Mutex};
+use std::sync::{Arc, Mutex, OnceLock};
 use std::time::Duration;
 use tokio::io::{AsyncBufReadExt, BufReader};
-use tokio::sync::oneshot;
+use tokio::sync::Semaphore;
+use tokio::task::JoinSet;
 use tracing::{error, info, warn};
 
 // --- MCP Protocol Structs (Simplified) ---
@@ -28,8 +31,9 @@ struct JsonRpcRequest {
 #[derive(Debug, Serialize, Deserialize)]
 struct JsonRpcResponse {
     jsonrpc: String,
+    // Borrowed for the fixed initialize/list results, owned otherwise
     #[serde(skip_serializing_if = "Option::is_none")]
-    result: Option<Value>,
+    result: Option<Cow<'static, Value>>,
     #[serde(skip_serializing_if = "Option::is_none")]
     error: Option<ValueError>,
     #[serde(skip_serializing_if = "Option::is_none")]
@@ -39,17 +43,22 @@ struct JsonRpcResponse {
 #[derive(Debug, Serialize, Deserialize)]
 struct ValueError {
     code: i32,
-    message: String,
+    message: Cow<'static, str>,
     #[serde(skip_serializing_if = "Option::is_none")]
     data: Option<Value>,
 }
 
+// Fixed JSON-RPC error messages
+const ERR_METHOD_NOT_FOUND: &str = "Method not found";
+const ERR_RESOURCE_READ: &str = "Timeout or Error";
+const ERR_SKILL_FAILED: &str = "Skill execution failed/timeout";
+
 // --- App State ---
 
 struct AppState {
     producer: FutureProducer,
     reply_topic: String,
-    pending_requests: Arc<Mutex<HashMap<String, oneshot::Sender<Value>>>>,
+    pending_requests: PendingMap,
 }
 
 #[tokio::main]
@@ -69,9 +78,7 @@ async fn main() -> Result<()> {
     info!("Connecting to Kafka at {}, reply topic: {}", broker_url, reply_topic);
 
     // Create Producer
-    let producer: FutureProducer = ClientConfig::new()
-        .set("bootstrap.servers", &broker_url)
-        .set("message.timeout.ms", "5000")
+    let producer: FutureProducer = producer_config(&broker_url)
         .create()
         .expect("Producer creation error");
 
@@ -80,6 +87,7 @@ async fn main() -> Result<()> {
         .set("group.id", &group_id)
         .set("bootstrap.servers", &broker_url)
         .set("enable.partition.eof", "false")
+        .set("socket.nagle.disable", "true")
         .set("session.timeout.ms", "6000")
         .set("enable.auto.commit", "true")
         .set("auto.offset.reset", "earliest")
@@ -88,7 +96,7 @@ async fn main() -> Result<()> {
 
     consumer.subscribe(&[&reply_topic]).expect("Subscribe failed");
 
-    let pending_requests: Arc<Mutex<HashMap<String, oneshot::Sender<Value>>>> = Arc::new(Mutex::new(HashMap::new()));
+    let pending_requests: PendingMap = Arc::new(Mutex::new(HashMap::with_capacity(PENDING_CAPACITY)));
     let pending_clone = pending_requests.clone();
 
     // Spawn consumer loop
@@ -98,14 +106,23 @@ async fn main() -> Result<()> {
         loop {
             match consumer.recv().await {
                 Ok(m) => {
-                     let payload = match m.payload_view::<str>() {
-                        None => "",
-                        Some(Ok(s)) => s,
-                        Some(Err(_)) => "",
-                    };
+                    let payload = m.payload().unwrap_or_default();
                     if !payload.is_empty() {
-                        // info!("Received Kafka reply: {}", payload);
-                        if let Ok(json_val) = serde_json::from_str::<Value>(payload) {
+                        // Replies are keyed by request_id: claim the waiter first so
+                        // a keyed reply is parsed only once claimed.
+                        if let Some(req_id) = m.key().and_then(|k| std::str::from_utf8(k).ok()) {
+                            let tx = pending_clone.lock().unwrap().remove(req_id);
+                            if let Some(tx) = tx {
+                                match serde_json::from_slice::<Value>(payload) {
+                                    Ok(json_val) => { let _ = tx.send(json_val); }
+                                    Err(e) => warn!("Malformed reply for {}: {}", req_id, e),
+                                }
+                                continue;
+                            }
+                        }
+                        // Unkeyed, or keyed with something other than a pending
+                        // request id: fall back to metadata.request_id
+                        if let Ok(json_val) = serde_json::from_slice::<Value>(payload) {
                              // Check for request_id in metadata
                              if let Some(meta) = json_val.get("metadata") {
                                  if let Some(req_id) = meta.get("request_id").and_then(|v| v.as_str()) {
@@ -123,16 +140,29 @@ async fn main() -> Result<()> {
         }
     });
 
-    let state = AppState {
+    let state = Arc::new(AppState {
         producer,
         reply_topic,
         pending_requests,
-    };
+    });
 
     // Stdio Loop
+    // Each request runs on its own task and writes its response when done, so a
+    // slow skill call doesn't hold up the requests queued behind it on stdin.
+    // Responses carry the JSON-RPC id, so clients match them regardless of order.
     let stdin = tokio::io::stdin();
     let reader = BufReader::new(stdin);
     let mut lines = reader.lines();
+    let mut inflight = JoinSet::new();
+
+    // Number of requests allowed in flight at once; once all slots are
+    // taken, stdin is not read until one finishes.
+    let max_inflight = std::env::var("SKILLSCALE_MCP_MAX_INFLIGHT")
+        .ok()
+        .and_then(|v| v.parse::<usize>().ok())
+        .filter(|&n| n > 0)
+        .unwrap_or(16);
+    let slots = Arc::new(Semaphore::new(max_inflight));
 
     while let Ok(Some(line)) = lines.next_line().await {
         if line.trim().is_empty() { continue; }
@@ -140,40 +170,99 @@ async fn main() -> Result<()> {
         // Parse Request
         match serde_json::from_str::<JsonRpcRequest>(&line) {
             Ok(req) => {
-                match handle_request(&state, req).await {
-                    Some(resp) => {
-                        let response_str = serde_json::to_string(&resp).unwrap();
-                        println!("{}", response_str); 
+                let permit = slots.clone().acquire_owned().await
+                    .expect("in-flight semaphore closed");
+                let state = state.clone();
+                inflight.spawn(async move {
+                    match handle_request(&state, req).await {
+                        Some(resp) => {
+                            // println! holds the stdout lock per line, so responses never interleave
+                            let response_str = serde_json::to_string(&resp).unwrap();
+                            println!("{}", response_str); 
+                        }
+                        None => {} // Notification handling (no response)
                     }
-                    None => {} // Notification handling (no response)
-                }
+                    drop(permit);
+                });
             },
             Err(e) => {
                 error!("Failed to parse JSON-RPC: {}", e);
             }
         }
+
+        // Reap finished requests so the set only holds in-flight ones
+        while inflight.try_join_next().is_some() {}
     }
 
+    // stdin closed: let in-flight requests finish and answer before exiting
+    while inflight.join_next().await.is_some() {}
+
     Ok(())
 }
 
+// Fixed results for the static MCP methods, built once and served borrowed
+fn initialize_result() -> &'static Value {
+    static RESULT: OnceLock<Value> = OnceLock::new();
+    RESULT.get_or_init(|| {
+        json!({
+            "protocolVersion": "2024-11-05", // MCP version
+            "capabilities": {
+                "tools": {},
+                "resources": {}
+            },
+            "serverInfo": {
+                "name": "skillscale-mcp-rust",
+                "version": "0.1.0"
+            }
+        })
+    })
+}
+
+fn tools_list_result() -> &'static Value {
+    static RESULT: OnceLock<Value> = OnceLock::new();
+    RESULT.get_or_init(|| {
+        json!({
+            "tools": [
+                {
+                    "name": "invoke_skill",
+                    "description": "Expose internal Kafka-backed skills to MCP clients.\n            This routes an MCP tool call transparently over Kafka to the corresponding Skill Server.",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "category": { "type": "string" },
+                            "skill_name": { "type": "string" },
+                            "payload": { "type": "object" }
+                        },
+                        "required": ["skill_name", "payload"]
+                    }
+                }
+            ]
+        })
+    })
+}
+
+fn resources_list_result() -> &'static Value {
+    static RESULT: OnceLock<Value> = OnceLock::new();
+    RESULT.get_or_init(|| {
+        json!({
+            "resources": [
+                {
+                    "uri": "skillscale://context/session_123",
+                    "name": "Example Shared Context",
+                    "mimeType": "application/json"
+                }
+            ]
+        })
+    })
+}
+
 async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpcResponse> {
     match req.method.as_str() {
         "initialize" => {
             Some(JsonRpcResponse {
                 jsonrpc: "2.0".to_string(),
                 id: req.id,
-                result: Some(json!({
-                    "protocolVersion": "2024-11-05", // MCP version
-                    "capabilities": {
-                        "tools": {},
-                        "resources": {}
-                    },
-                    "serverInfo": {
-                        "name": "skillscale-mcp-rust",
-                        "version": "0.1.0"
-                    }
-                })),
+                result: Some(Cow::Borrowed(initialize_result())),
                 error: None,
             })
         },
@@ -184,7 +273,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                  Some(JsonRpcResponse {
                      jsonrpc: "2.0".to_string(),
                      id: req.id,
-                     result: Some(json!(true)),
+                     result: Some(Cow::Owned(json!(true))),
                      error: None
                  })
              } else {
@@ -195,23 +284,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
             Some(JsonRpcResponse {
                 jsonrpc: "2.0".to_string(),
                 id: req.id,
-                result: Some(json!({
-                    "tools": [
-                        {
-                            "name": "invoke_skill",
-                            "description": "Expose internal Kafka-backed skills to MCP clients.\n            This routes an MCP tool call transparently over Kafka to the corresponding Skill Server.",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "category": { "type": "string" },
-                                    "skill_name": { "type": "string" },
-                                    "payload": { "type": "object" }
-                                },
-                                "required": ["skill_name", "payload"]
-                            }
-                        }
-                    ]
-                })),
+                result: Some(Cow::Borrowed(tools_list_result())),
                 error: None
             })
         },
@@ -219,15 +292,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
              Some(JsonRpcResponse {
                 jsonrpc: "2.0".to_string(),
                 id: req.id,
-                result: Some(json!({
-                    "resources": [
-                        {
-                            "uri": "skillscale://context/session_123",
-                            "name": "Example Shared Context",
-                            "mimeType": "application/json"
-                        }
-                    ]
-                })),
+                result: Some(Cow::Borrowed(resources_list_result())),
                 error: None
             })
         },
@@ -237,7 +302,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
              let uri = req.params["uri"].as_str().unwrap_or("");
              
              let topic = "TOPIC_CONTEXT_SYNC";
-             let request_id = uuid::Uuid::new_v4().to_string();
+             let request_id = next_request_id();
              let payload = json!({
                  "action": "read",
                  "uri": uri,
@@ -252,7 +317,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                   Some(JsonRpcResponse {
                     jsonrpc: "2.0".to_string(),
                     id: req.id,
-                    result: Some(json!({
+                    result: Some(Cow::Owned(json!({
                         "contents": [
                             {
                                 "uri": uri,
@@ -260,7 +325,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                                 "text": res.to_string()
                             }
                         ]
-                    })),
+                    }))),
                     error: None
                  })
              } else {
@@ -268,7 +333,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                     jsonrpc: "2.0".to_string(),
                     id: req.id,
                     result: None,
-                    error: Some(ValueError { code: -32603, message: "Timeout or Error".to_string(), data: None })
+                    error: Some(ValueError { code: -32603, message: Cow::Borrowed(ERR_RESOURCE_READ), data: None })
                  })
              }
         },
@@ -281,8 +346,8 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                 let category = args["category"].as_str().unwrap_or("CODE_ANALYSIS"); // default
                 let inner_payload = &args["payload"];
                 
-                let topic = format!("TOPIC_{}", category.to_uppercase().replace("-", "_"));
-                let request_id = uuid::Uuid::new_v4().to_string();
+                let topic = topic_for_category(category);
+                let request_id = next_request_id();
                 
                 // Construct skill payload
                 let payload = json!({
@@ -298,29 +363,27 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                 info!("Routing tool '{}' to Kafka '{}' (req: {})", skill_name, topic, request_id);
                 
                 match send_and_wait(state, &topic, &request_id, payload).await {
-                    Ok(res) => {
+                    Ok(mut res) => {
                          // MCP expects content array
-                         let mut text_res = res.to_string();
-                         // Should we extract result from response? The skill returns full JSON {"result": ..., "status": ...}
-                         if let Some(r) = res.get("result") {
-                             if let Some(s) = r.as_str() {
-                                 text_res = s.to_string();
-                             } else {
-                                 text_res = r.to_string();
-                             }
-                         }
+                         // The skill returns full JSON {"result": ..., "status": ...}; move the
+                         // result out instead of serializing the whole reply up front
+                         let text_res = match res.get_mut("result").map(Value::take) {
+                             Some(Value::String(s)) => s,
+                             Some(r) => r.to_string(),
+                             None => res.to_string(),
+                         };
 
                          Some(JsonRpcResponse {
                             jsonrpc: "2.0".to_string(),
                             id: req.id,
-                            result: Some(json!({
+                            result: Some(Cow::Owned(json!({
                                 "content": [
                                     {
                                         "type": "text",
                                         "text": text_res
                                     }
                                 ]
-                            })),
+                            }))),
                             error: None
                          })
                     },
@@ -329,7 +392,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                             jsonrpc: "2.0".to_string(),
                             id: req.id,
                             result: None,
-                            error: Some(ValueError { code: -32000, message: "Skill execution failed/timeout".to_string(), data: None })
+                            error: Some(ValueError { code: -32000, message: Cow::Borrowed(ERR_SKILL_FAILED), data: None })
                         })
                     }
                 }
@@ -339,7 +402,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                     jsonrpc: "2.0".to_string(),
                     id: req.id,
                     result: None,
-                    error: Some(ValueError { code: -32601, message: "Method not found".to_string(), data: None })
+                    error: Some(ValueError { code: -32601, message: Cow::Borrowed(ERR_METHOD_NOT_FOUND), data: None })
                 })
             }
         },
@@ -349,7 +412,7 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
                     jsonrpc: "2.0".to_string(),
                     id: req.id,
                     result: None,
-                    error: Some(ValueError { code: -32601, message: "Method not found".to_string(), data: None })
+                    error: Some(ValueError { code: -32601, message: Cow::Borrowed(ERR_METHOD_NOT_FOUND), data: None })
                  })
             } else {
                  None
@@ -359,25 +422,17 @@ async fn handle_request(state: &AppState, req: JsonRpcRequest) -> Option<JsonRpc
 }
 
 async fn send_and_wait(state: &AppState, topic: &str, request_id: &str, payload: Value) -> Result<Value> {
-    let payload_str = serde_json::to_string(&payload)?;
+    let payload_bytes = serde_json::to_vec(&payload)?;
     
     // Setup oneshot
-    let (tx, rx) = oneshot::channel();
-    {
-        let mut map = state.pending_requests.lock().unwrap();
-        map.insert(request_id.to_string(), tx);
-    }
+    let (_pending, rx) = register_pending(&state.pending_requests, request_id);
     
     // Produce
     let record = FutureRecord::to(topic)
         .key(request_id)
-        .payload(&payload_str);
+        .payload(&payload_bytes);
         
     if let Err((e, _)) = state.producer.send(record, Timeout::After(Duration::from_secs(5))).await {
-        {
-            let mut map = state.pending_requests.lock().unwrap();
-            map.remove(request_id);
-        }
         anyhow::bail!("Kafka produce error: {}", e);
     }
     
@@ -389,10 +444,6 @@ async fn send_and_wait(state: &AppState, topic: &str, request_id: &str, payload:
              anyhow::bail!("Channel closed");
         },
         Err(_) => {
-            {
-                let mut map = state.pending_requests.lock().unwrap();
-                map.remove(request_id);
-            }
              anyhow::bail!("Timeout");
         }
     }
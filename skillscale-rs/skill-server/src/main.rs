@@ -1,8 +1,10 @@
 use anyhow::{Context, Result};
 use std::path::{Path, PathBuf};
-use tracing::{info, warn, error};
+use std::sync::Arc;
+use tracing::{debug, info, warn, error};
 use std::process::Stdio;
 use tokio::process::Command;
+use tokio::sync::Semaphore;
 use tokio::io::AsyncWriteExt; // Import AsyncWriteExt for write_all
 use std::time::Duration;
 use rdkafka::config::ClientConfig;
@@ -10,7 +12,8 @@ use rdkafka::consumer::{Consumer, StreamConsumer};
 use rdkafka::message::Message;
 use rdkafka::producer::{FutureProducer, FutureRecord};
 use rdkafka::util::Timeout;
-use common::{SendTaskParams, Part};
+use serde::{Deserialize, Serialize};
+use common::{producer_config, SendTaskParams, Part};
 
 #[tokio::main]
 async fn main() -> Result<()> {
@@ -29,6 +32,7 @@ async fn main() -> Result<()> {
         .set("group.id", &group_id)
         .set("bootstrap.servers", &broker_url)
         .set("enable.partition.eof", "false")
+        .set("socket.nagle.disable", "true")
         .set("session.timeout.ms", "6000")
         .set("enable.auto.commit", "true")
         .set("auto.offset.reset", "earliest")
@@ -36,9 +40,7 @@ async fn main() -> Result<()> {
         .context("Consumer creation failed")?;
 
     // Create Producer for replies
-    let producer: FutureProducer = ClientConfig::new()
-        .set("bootstrap.servers", &broker_url)
-        .set("message.timeout.ms", "5000")
+    let producer: FutureProducer = producer_config(&broker_url)
         .create()
         .context("Producer creation failed")?;
     
@@ -46,7 +48,16 @@ async fn main() -> Result<()> {
     consumer.subscribe(&[&topic])
         .context("Can't subscribe to topic")?;
 
-    info!("Subscribed to '{}'. Waiting for messages...", topic);
+    // Number of skill executions allowed in flight at once
+    let workers = std::env::var("SKILLSCALE_WORKERS")
+        .ok()
+        .and_then(|v| v.parse::<usize>().ok())
+        .filter(|&n| n > 0)
+        .unwrap_or(2);
+    let slots = Arc::new(Semaphore::new(workers));
+    let exec_path = Arc::new(exec_path);
+
+    info!("Subscribed to '{}' with {} worker(s). Waiting for messages...", topic, workers);
 
     loop {
         match consumer.recv().await {
@@ -61,92 +72,135 @@ async fn main() -> Result<()> {
                     }
                 };
                 
-                info!("Received message: {}", payload);
+                debug!("Received message ({} bytes)", payload.len());
                 if !payload.is_empty() {
-                    // Extract reply metadata
-                    let mut reply_to = None;
-                    let mut request_id = None;
-                    
-                    // Try to parse as JSON first to get metadata
-                    if let Ok(json_val) = serde_json::from_str::<serde_json::Value>(payload) {
-                        if let Some(meta) = json_val.get("metadata") {
-                            reply_to = meta.get("reply_to").and_then(|v| v.as_str()).map(|s| s.to_string());
-                            request_id = meta.get("request_id").and_then(|v| v.as_str()).map(|s| s.to_string());
-                        }
-                    }
+                    // Wait for a free worker slot before taking the next message,
+                    // so at most `workers` skills execute at once.
+                    let permit = slots.clone().acquire_owned().await
+                        .expect("worker semaphore closed");
+                    let payload = payload.to_string();
+                    let exec_path = exec_path.clone();
+                    let producer = producer.clone();
+                    tokio::spawn(async move {
+                        handle_message(&exec_path, &producer, &payload).await;
+                        drop(permit);
+                    });
+                }
+            }
+        }
+    }
+}
 
-                    // Try to parse as SendTaskParams to extract skill name and input text
-                    let (skill_name, skill_input) = match serde_json::from_str::<SendTaskParams>(payload) {
-                        Ok(params) => {
-                            let s = params.metadata.as_ref()
-                                .and_then(|m| m.get("skill").cloned())
-                                .unwrap_or_else(|| String::new());
-                            
-                            let text = params.message.parts.iter()
-                                .filter_map(|p| match p {
-                                    Part::Text { text } => Some(text.as_str()),
-                                })
-                                .collect::<Vec<&str>>()
-                                .join("\n");
-                            
-                            (s, text)
-                        }
-                        Err(_) => {
-                            // Fallback: try parsing as generic JSON {"skill": ..., "input": ...}
-                            match serde_json::from_str::<serde_json::Value>(payload) {
-                                Ok(v) => {
-                                    let s = v["skill"].as_str().unwrap_or("").to_string();
-                                    let i = v["input"].as_str().unwrap_or(payload).to_string();
-                                    (s, i)
-                                }
-                                Err(_) => (String::new(), payload.to_string()),
-                            }
-                        }
-                    };
-
-                    info!("Executing skill: '{}' with input len: {}", skill_name, skill_input.len());
-                    
-                    let execution_result = match execute_skill(&exec_path, &skill_name, &skill_input).await {
-                        Ok(output) => {
-                            info!("Skill execution successful.");
-                            Ok(output)
-                        }
-                        Err(e) => {
-                            error!("Execution failed: {:?}", e);
-                            Err(e.to_string())
-                        }
-                    };
-                    
-                    // Send Reply if reply_to and request_id exist
-                    if let (Some(reply_topic), Some(req_id)) = (reply_to, request_id) {
-                        let response_payload = match execution_result {
-                            Ok(output) => serde_json::json!({
-                                "result": output,
-                                "status": "success",
-                                "metadata": { "request_id": req_id }
-                            }),
-                            Err(err_msg) => serde_json::json!({
-                                "error": err_msg,
-                                "status": "error",
-                                "metadata": { "request_id": req_id }
-                            })
-                        };
-                        
-                        let payload_str = response_payload.to_string();
-                        let record = FutureRecord::to(&reply_topic)
-                            .key(&req_id)
-                            .payload(&payload_str);
-                            
-                        info!("Sending reply to {} (req: {})", reply_topic, req_id);
-                        if let Err((e, _)) = producer.send(record, Timeout::After(Duration::from_secs(5))).await {
-                            error!("Failed to send reply: {}", e);
-                        }
-                    } else {
-                        warn!("No reply_to/request_id found in metadata, skipping reply.");
-                    }
+/// Reply published to `reply_to`; serialized straight from borrowed fields
+/// rather than through an intermediate `serde_json::Value` tree.
+#[derive(Serialize)]
+struct SkillReply<'a> {
+    #[serde(skip_serializing_if = "Option::is_none")]
+    result: Option<&'a str>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    error: Option<&'a str>,
+    status: &'static str,
+    metadata: ReplyMetadata<'a>,
+}
+
+#[derive(Serialize)]
+struct ReplyMetadata<'a> {
+    request_id: &'a str,
+}
+
+/// Execute one skill request and publish its reply (if the request asked for one).
+async fn handle_message(exec_path: &Path, producer: &FutureProducer, payload: &str) {
+    // Parse the payload once; reply metadata, the A2A task params and the
+    // generic fallback are all read from this single tree.
+    let json_val = serde_json::from_str::<serde_json::Value>(payload).ok();
+
+    // Extract reply metadata
+    let (reply_to, request_id) = match json_val.as_ref().and_then(|v| v.get("metadata")) {
+        Some(meta) => (
+            meta.get("reply_to").and_then(|v| v.as_str()).map(|s| s.to_string()),
+            meta.get("request_id").and_then(|v| v.as_str()).map(|s| s.to_string()),
+        ),
+        None => (None, None),
+    };
+
+    // Try to read it as SendTaskParams to extract skill name and input text
+    let (skill_name, skill_input) = match &json_val {
+        Some(v) => match SendTaskParams::deserialize(v) {
+            Ok(params) => {
+                let s = params.metadata.as_ref()
+                    .and_then(|m| m.get("skill").cloned())
+                    .unwrap_or_else(|| String::new());
+                
+                // Join the text parts without an intermediate Vec; a
+                // single-part message (the usual case) reuses its String.
+                let mut parts = params.message.parts.into_iter()
+                    .map(|p| match p {
+                        Part::Text { text } => text,
+                    });
+                let mut text = parts.next().unwrap_or_default();
+                for part in parts {
+                    text.push('\n');
+                    text.push_str(&part);
                 }
+                
+                (s, text)
+            }
+            Err(_) => {
+                // Fallback: generic JSON {"skill": ..., "input": ...}
+                let s = v["skill"].as_str().unwrap_or("").to_string();
+                let i = v["input"].as_str().unwrap_or(payload).to_string();
+                (s, i)
             }
+        },
+        None => (String::new(), payload.to_string()),
+    };
+
+    // Tag every log line of this execution with its request id, so
+    // concurrent executions can be told apart
+    let log_req = request_id.as_deref().unwrap_or("-");
+    info!("Executing skill: '{}' (req: {}) with input len: {}",
+        skill_name, log_req, skill_input.len());
+    
+    let execution_result = match execute_skill(&exec_path, &skill_name, &skill_input).await {
+        Ok(output) => {
+            info!("Skill execution successful (req: {})", log_req);
+            Ok(output)
+        }
+        Err(e) => {
+            error!("Execution failed (req: {}): {:?}", log_req, e);
+            Err(e.to_string())
+        }
+    };
+    
+    // Send Reply if reply_to and request_id exist
+    if let (Some(reply_topic), Some(req_id)) = (reply_to, request_id) {
+        let metadata = ReplyMetadata { request_id: &req_id };
+        let response_payload = match &execution_result {
+            Ok(output) => SkillReply {
+                result: Some(output),
+                error: None,
+                status: "success",
+                metadata,
+            },
+            Err(err_msg) => SkillReply {
+                result: None,
+                error: Some(err_msg),
+                status: "error",
+                metadata,
+            },
+        };
+        
+        let payload_bytes = serde_json::to_vec(&response_payload).unwrap_or_default();
+        let record = FutureRecord::to(&reply_topic)
+            .key(&req_id)
+            .payload(&payload_bytes);
+            
+        info!("Sending reply to {} (req: {})", reply_topic, req_id);
+        if let Err((e, _)) = producer.send(record, Timeout::After(Duration::from_secs(5))).await {
+            error!("Failed to send reply: {}", e);
         }
+    } else {
+        warn!("No reply_to/request_id found in metadata, skipping reply.");
     }
 }
 
@@ -199,5 +253,8 @@ async fn execute_skill(exec_path: &Path, skill_name: &str, intent: &str) -> Resu
         anyhow::bail!("Skill execution failed: {}", stderr);
     }
     
-    Ok(String::from_utf8_lossy(&output.stdout).to_string())
+    // Valid UTF-8 (the usual case) takes over the captured buffer as-is;
+    // only invalid output is copied into a lossy String
+    Ok(String::from_utf8(output.stdout)
+        .unwrap_or_else(|e| String::from_utf8_lossy(e.as_bytes()).into_owned()))
 }